@@ -13,51 +13,167 @@
 # limitations under the License.
 
 import dataclasses
-from typing import List, Optional
+import functools
+import sys
+import weakref
+from typing import TYPE_CHECKING, List, Optional, TextIO, Tuple
 
-import inflection
-import libcst
-
-from gapic.configurable_snippetgen import libcst_utils
+from gapic import utils
 from gapic.configurable_snippetgen import snippet_config_language_pb2
 from gapic.schema import api
 
+# libcst and inflection are slow to import, and are only needed once a
+# snippet is built, so they are imported where they are used.
+if TYPE_CHECKING:
+    import libcst
 
-class _AppendToSampleFunctionBody(libcst.CSTTransformer):
-    def __init__(self, statement: libcst.BaseStatement):
-        self.statement = statement
 
-    def visit_IndentedBlock(self, node: libcst.IndentedBlock) -> bool:
-        # Do not visit any nested indented blocks.
-        return False
+@functools.lru_cache(maxsize=None)
+def _base_function_def(is_sync: bool) -> "libcst.FunctionDef":
+    """Returns the base sample function def.
 
-    def leave_IndentedBlock(
-        self, original_node: libcst.IndentedBlock, updated_node: libcst.IndentedBlock
-    ) -> libcst.IndentedBlock:
-        del original_node
-        # FunctionDef.body is an IndentedBlock, and IndentedBlock.body
-        # is the actual sequence of statements.
-        new_body = list(updated_node.body) + [self.statement]
-        return updated_node.with_changes(body=new_body)
+    libcst nodes are immutable, so the base sample function defs are built
+    once and shared, with only the function name changed per snippet.
+    """
+    from gapic.configurable_snippetgen import libcst_utils
+
+    return libcst_utils.base_function_def(
+        function_name="__PLACEHOLDER__", is_sync=is_sync
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _underscore(name: str) -> str:
+    """Memoized inflection.underscore.
+
+    Many snippets share the same RPC names, so the conversion is only done
+    once per name.
+    """
+    import inflection
+
+    return inflection.underscore(name)
+
+
+@functools.lru_cache(maxsize=256)
+def _build_parameters(serialized_parameters: Tuple[bytes, ...]) -> "libcst.Parameters":
+    """Returns the sample function parameters for the given declarations.
+
+    Protobuf messages are not hashable, so the declarations are passed in
+    serialized form. libcst nodes are immutable, so the result can be shared
+    by all snippets with the same parameters.
+    """
+    import libcst
+
+    from gapic.configurable_snippetgen import libcst_utils
+
+    Declaration = snippet_config_language_pb2.Statement.Declaration
+    params = [
+        libcst_utils.convert_parameter(Declaration.FromString(serialized))
+        for serialized in serialized_parameters
+    ]
+    return libcst.Parameters(params=params)
+
+
+@dataclasses.dataclass(frozen=True)
+class _ServiceMeta:
+    """Names shared by all the snippets of a service."""
+    gapic_module_name: str
+    client_class_name: str
+    async_client_class_name: str
+
+    @classmethod
+    def build(
+        cls, proto_package: str, service_name: str, api_version: str
+    ) -> "_ServiceMeta":
+        module_name = proto_package.rpartition(".")[2]
+        return cls(
+            gapic_module_name=sys.intern(f"{module_name}_{api_version}"),
+            client_class_name=f"{service_name}Client",
+            async_client_class_name=f"{service_name}AsyncClient",
+        )
+
+
+# Keyed on (proto_package, service_name, api_version). Entries live as long as
+# some snippet of the service still references them.
+_SERVICE_META_CACHE: "weakref.WeakValueDictionary[Tuple[str, str, str], _ServiceMeta]" = (
+    weakref.WeakValueDictionary()
+)
 
 
-@dataclasses.dataclass
+def _get_service_meta(
+    proto_package: str, service_name: str, api_version: str
+) -> _ServiceMeta:
+    key = (proto_package, service_name, api_version)
+    meta = _SERVICE_META_CACHE.get(key)
+    if meta is None:
+        meta = _ServiceMeta.build(*key)
+        _SERVICE_META_CACHE[key] = meta
+    return meta
+
+
+@dataclasses.dataclass(eq=False, repr=False)
 class ConfiguredSnippet:
+    # dataclass(slots=True) requires Python 3.10, so the slots are declared
+    # by hand. This works because none of the fields have default values.
+    __slots__ = (
+        "api_schema",
+        "config",
+        "api_version",
+        "is_sync",
+        "_meta",
+        "_sync_or_async",
+        "_module",
+        "_code",
+        "_sample_function_def",
+        "_sample_function_body",
+        # Used by utils.cached_property.
+        "_cached_values",
+    )
+
     api_schema: api.API
     config: snippet_config_language_pb2.SnippetConfig
     api_version: str
     is_sync: bool
 
     def __post_init__(self) -> None:
+        import libcst
+
+        from gapic.configurable_snippetgen import libcst_utils
+
+        # The same few API versions are shared by every snippet of an API.
+        self.api_version = sys.intern(self.api_version)
+        rpc = self.config.rpc
+        self._meta = _get_service_meta(
+            rpc.proto_package, rpc.service_name, self.api_version
+        )
+        # is_sync is fixed for the lifetime of the snippet, so the pieces of
+        # the names that depend on it are only picked once.
+        self._sync_or_async = "sync" if self.is_sync else "async"
         self._module: libcst.Module = libcst_utils.empty_module()
-        self._sample_function_def: libcst.FunctionDef = libcst_utils.base_function_def(
-            function_name=self.sample_function_name, is_sync=self.is_sync
+        # The rendered code of self._module, computed on first access.
+        self._code: Optional[str] = None
+        base_function_def = _base_function_def(self.is_sync)
+        self._sample_function_def: libcst.FunctionDef = base_function_def.with_changes(
+            name=libcst.Name(value=self.sample_function_name)
         )
+        # Statements to be appended to the body of the sample function def.
+        self._sample_function_body: List[libcst.BaseStatement] = []
 
     @property
     def code(self) -> str:
         """The code of the configured snippet."""
-        return self._module.code
+        # Module.code re-runs codegen over the whole tree on every access.
+        if self._code is None:
+            self._code = self._module.code
+        return self._code
+
+    def write_to(self, fp: TextIO) -> None:
+        """Writes the code of the configured snippet to a text file.
+
+        The rendered code is memoized, so writing the snippet does not
+        render the module again.
+        """
+        fp.write(self.code)
 
     @property
     def gapic_module_name(self) -> str:
@@ -66,34 +182,45 @@ class ConfiguredSnippet:
         For example:
             "speech_v1"
         """
-        module_name = self.config.rpc.proto_package.split(".")[-1]
-        return f"{module_name}_{self.api_version}"
+        return self._meta.gapic_module_name
 
-    @property
+    @utils.cached_property
     def region_tag(self) -> str:
         """The region tag of the snippet.
 
         For example:
             "speech_v1_config_Adaptation_CreateCustomClass_Basic_async"
         """
-        service_name = self.config.rpc.service_name
-        rpc_name = self.config.rpc.rpc_name
-        config_id = self.config.metadata.config_id
-        sync_or_async = "sync" if self.is_sync else "async"
-        return f"{self.gapic_module_name}_config_{service_name}_{rpc_name}_{config_id}_{sync_or_async}"
+        rpc = self.config.rpc
+        region_tag = "_".join(
+            (
+                self.gapic_module_name,
+                "config",
+                rpc.service_name,
+                rpc.rpc_name,
+                self.config.metadata.config_id,
+                self._sync_or_async,
+            )
+        )
+        # Region tags are used as keys in snippet indexes, so intern them.
+        return sys.intern(region_tag)
 
-    @property
+    @utils.cached_property
     def sample_function_name(self) -> str:
         """The sample function's name.
 
         For example:
             "sample_create_custom_class_Basic"
         """
-        snippet_method_name = self.config.signature.snippet_method_name
-        config_id = self.config.metadata.config_id
-        return f"sample_{snippet_method_name}_{config_id}"
+        return "_".join(
+            (
+                "sample",
+                self.config.signature.snippet_method_name,
+                self.config.metadata.config_id,
+            )
+        )
 
-    @property
+    @utils.cached_property
     def client_class_name(self) -> str:
         """The service client's class name.
 
@@ -102,36 +229,41 @@ class ConfiguredSnippet:
             "AdaptationAsyncClient"
         """
         if self.is_sync:
-            client_class_name = f"{self.config.rpc.service_name}Client"
-        else:
-            client_class_name = f"{self.config.rpc.service_name}AsyncClient"
-        return client_class_name
+            return self._meta.client_class_name
+        return self._meta.async_client_class_name
 
-    @property
+    @utils.cached_property
     def filename(self) -> str:
         """The snippet's file name.
 
         For example:
             "speech_v1_generated_Adaptation_create_custom_class_Basic_async.py"
         """
-        service_name = self.config.rpc.service_name
-        snake_case_rpc_name = inflection.underscore(self.config.rpc.rpc_name)
-        config_id = self.config.metadata.config_id
-        sync_or_async = "sync" if self.is_sync else "async"
-        return f"{self.gapic_module_name}_generated_{service_name}_{snake_case_rpc_name}_{config_id}_{sync_or_async}.py"
+        rpc = self.config.rpc
+        stem = "_".join(
+            (
+                self.gapic_module_name,
+                "generated",
+                rpc.service_name,
+                _underscore(rpc.rpc_name),
+                self.config.metadata.config_id,
+                self._sync_or_async,
+            )
+        )
+        return f"{stem}.py"
 
-    @property
+    @utils.cached_property
     def api_endpoint(self) -> Optional[str]:
         """The api_endpoint in client_options."""
         service_endpoint = (
             self.config.snippet.service_client_initialization.custom_service_endpoint
         )
 
-        if not service_endpoint.host:
+        host = service_endpoint.host
+        if not host:
             return None
 
         schema = service_endpoint.schema
-        host = service_endpoint.host
         region = service_endpoint.region
         port = service_endpoint.port
 
@@ -155,17 +287,14 @@ class ConfiguredSnippet:
             return host_maybe_with_port_and_region
 
     def _extend_sample_function_def_body(
-        self, statements: List[libcst.BaseStatement]
+        self, statements: List["libcst.BaseStatement"]
     ) -> None:
-        """Appends the statements to the current sample function def."""
-        for statement in statements:
-            transformer = _AppendToSampleFunctionBody(statement)
+        """Appends the statements to the current sample function def.
 
-            # The result of applying a transformer could be of a different type
-            # in general, but we will only update the sample function def here.
-            self._sample_function_def = self._sample_function_def.visit(
-                transformer
-            )  # type: ignore
+        The statements are collected and only added to the FunctionDef node
+        once, in _add_sample_function.
+        """
+        self._sample_function_body.extend(statements)
 
     def _add_sample_function_parameters(self) -> None:
         """Adds sample function parameters.
@@ -178,15 +307,17 @@ class ConfiguredSnippet:
                 ...
         """
         # TODO: https://github.com/googleapis/gapic-generator-python/issues/1537, add typing annotation in sample function parameters.
-        params = []
-        for config_parameter in self.config.signature.parameters:
-            params.append(libcst_utils.convert_parameter(config_parameter))
-        parameters = libcst.Parameters(params=params)
+        parameters = _build_parameters(
+            tuple(
+                config_parameter.SerializeToString(deterministic=True)
+                for config_parameter in self.config.signature.parameters
+            )
+        )
         self._sample_function_def = self._sample_function_def.with_changes(
             params=parameters
         )
 
-    def _get_service_client_initialization(self) -> List[libcst.BaseStatement]:
+    def _get_service_client_initialization(self) -> List["libcst.BaseStatement"]:
         """Returns the service client initialization statements.
 
         Examples:
@@ -194,31 +325,45 @@ class ConfiguredSnippet:
 
             client = speech_v1.AdaptationClient(client_options = {"api_endpoint": "us-speech.googleapis.com"})
         """
+        import libcst
+
+        from gapic.configurable_snippetgen import libcst_utils
+
+        args = []
         if self.api_endpoint is not None:
-            client_options_arg = libcst.Arg(
-                keyword=libcst.Name("client_options"),
-                value=libcst_utils.convert_py_dict(
-                    [("api_endpoint", self.api_endpoint)]
-                ),
-            )
-            service_client_initialization = libcst.helpers.parse_template_statement(
-                f"client = {self.gapic_module_name}.{self.client_class_name}({{arg}})",
-                arg=client_options_arg,
-            )
-        else:
-            service_client_initialization = libcst.parse_statement(
-                f"client = {self.gapic_module_name}.{self.client_class_name}()"
+            args.append(
+                libcst.Arg(
+                    keyword=libcst.Name("client_options"),
+                    value=libcst_utils.convert_py_dict(
+                        [("api_endpoint", self.api_endpoint)]
+                    ),
+                )
             )
 
+        # Build the nodes directly rather than parsing source code.
+        client_class = libcst.Attribute(
+            value=libcst.Name(self.gapic_module_name),
+            attr=libcst.Name(self.client_class_name),
+        )
+        service_client_initialization = libcst.SimpleStatementLine(
+            body=[
+                libcst.Assign(
+                    targets=[libcst.AssignTarget(
+                        target=libcst.Name("client"))],
+                    value=libcst.Call(func=client_class, args=args),
+                )
+            ]
+        )
+
         # TODO: https://github.com/googleapis/gapic-generator-python/issues/1539, support pre_client_initialization statements.
         return [service_client_initialization]
 
-    def _get_standard_call(self) -> List[libcst.BaseStatement]:
+    def _get_standard_call(self) -> List["libcst.BaseStatement"]:
         """Returns the standard call statements."""
         # TODO: https://github.com/googleapis/gapic-generator-python/issues/1539, support standard call statements.
         return []
 
-    def _get_call(self) -> List[libcst.BaseStatement]:
+    def _get_call(self) -> List["libcst.BaseStatement"]:
         """Returns the snippet call statements."""
         call_type = self.config.snippet.WhichOneof("call")
         if call_type == "standard":
@@ -235,8 +380,19 @@ class ConfiguredSnippet:
         self._extend_sample_function_def_body(self._get_call())
 
     def _add_sample_function(self) -> None:
-        self._module = self._module.with_changes(
-            body=[self._sample_function_def])
+        import libcst
+
+        # FunctionDef.body is an IndentedBlock, and IndentedBlock.body
+        # is the actual sequence of statements. libcst stores it as a tuple.
+        block = self._sample_function_def.body
+        self._sample_function_def = self._sample_function_def.with_changes(
+            body=block.with_changes(
+                body=(*block.body, *self._sample_function_body))
+        )
+        # The pending statements are now part of the FunctionDef.
+        self._sample_function_body = []
+        self._module = libcst.Module(body=[self._sample_function_def])
+        self._code = None
 
     def generate(self) -> None:
         """Generates the snippet.
@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import io
 from pathlib import Path
 
 from google.protobuf import json_format
@@ -133,6 +134,16 @@ def test_client_class_name(is_sync, expected):
     assert snippet.client_class_name == expected
 
 
+def test_service_meta_is_shared():
+    sync_snippet = _make_configured_snippet(is_sync=True)
+    async_snippet = _make_configured_snippet(is_sync=False)
+    other_version_snippet = _make_configured_snippet(api_version="v1p1beta1")
+
+    assert sync_snippet._meta is async_snippet._meta
+    assert other_version_snippet._meta is not sync_snippet._meta
+    assert other_version_snippet.gapic_module_name == "speech_v1p1beta1"
+
+
 @pytest.mark.parametrize(
     "is_sync,expected",
     [
@@ -145,6 +156,21 @@ def test_filename(is_sync, expected):
     assert snippet.filename == expected
 
 
+def test_properties_are_cached(snippet):
+    region_tag = snippet.region_tag
+    filename = snippet.filename
+
+    # The properties are computed once and not recomputed from the config.
+    snippet.config.metadata.config_id = "Changed"
+    assert snippet.region_tag is region_tag
+    assert snippet.filename is filename
+
+
+def test_snippet_has_no_instance_dict(snippet):
+    snippet.generate()
+    assert not hasattr(snippet, "__dict__")
+
+
 @pytest.mark.parametrize(
     "custom_service_endpoint_dict,expected",
     [
@@ -218,40 +244,51 @@ def test_api_endpoint(custom_service_endpoint_dict, expected):
     assert snippet.api_endpoint == expected
 
 
-@pytest.mark.parametrize(
-    "is_sync,expected",
-    [
-        (True, "speech_v1_generated_Adaptation_create_custom_class_Basic_sync.py"),
-        (False, "speech_v1_generated_Adaptation_create_custom_class_Basic_async.py"),
-    ],
-)
-def test_filename(is_sync, expected):
+@pytest.mark.parametrize("is_sync", [True, False])
+def test_sample_function_def(is_sync):
     snippet = _make_configured_snippet(is_sync=is_sync)
-    assert snippet.filename == expected
+    function_def = snippet._sample_function_def
 
+    assert function_def.name.value == "sample_create_custom_class_Basic"
+    assert (function_def.asynchronous is None) == is_sync
 
-def test_AppendToSampleFunctionBody():
-    # Start with a function def with nonempty body to we can be sure the
-    # transformer appends the statement.
-    function_def = libcst.parse_statement("def f():\n    'hello'")
-    statement = libcst.parse_statement("'world'")
-    transformer = configured_snippet._AppendToSampleFunctionBody(statement)
-    updated_function_def = function_def.visit(transformer)
-    expected_function_def = libcst.parse_statement(
-        "def f():\n    'hello'\n    'world'")
-    assert updated_function_def.deep_equals(expected_function_def)
 
+def test_sample_function_parameters_are_shared():
+    snippets = [_make_configured_snippet(is_sync=is_sync)
+                for is_sync in (True, False)]
+    for snippet in snippets:
+        snippet._add_sample_function_parameters()
+
+    sync_params, async_params = (
+        s._sample_function_def.params for s in snippets)
+    assert [p.name.value for p in sync_params.params] == [
+        "parent", "custom_class_id"]
+    assert sync_params is async_params
+
+
+def test_extend_sample_function_def_body(snippet):
+    snippet._extend_sample_function_def_body(
+        [libcst.parse_statement("'hello'")])
+    snippet._extend_sample_function_def_body(
+        [libcst.parse_statement("'world'")])
+    snippet._add_sample_function()
 
-def test_AppendToSampleFunctionBody():
-    # Start with a function def with nonempty body to we can be sure the
-    # transformer appends the statement.
-    function_def = libcst.parse_statement("def f():\n    'hello'")
-    statement = libcst.parse_statement("'world'")
-    transformer = configured_snippet._AppendToSampleFunctionBody(statement)
-    updated_function_def = function_def.visit(transformer)
     expected_function_def = libcst.parse_statement(
-        "def f():\n    'hello'\n    'world'")
-    assert updated_function_def.deep_equals(expected_function_def)
+        "def sample_create_custom_class_Basic():\n    \"\"\n    'hello'\n    'world'"
+    )
+    assert snippet._sample_function_def.deep_equals(expected_function_def)
+
+
+def test_generate_twice(snippet):
+    snippet.generate()
+    snippet.generate()
+
+    # Each call to generate adds its statements to the FunctionDef only once.
+    client_lines = [
+        line for line in snippet.code.splitlines()
+        if line.strip().startswith("client = ")
+    ]
+    assert len(client_lines) == 2
 
 
 def test_code(snippet):
@@ -278,6 +315,24 @@ def test_code_without_endpoint(snippet_without_endpoint):
     assert snippet_without_endpoint.code == expected_code
 
 
+def test_code_before_and_after_generate(snippet):
+    assert snippet.code == "\n"
+
+    snippet.generate()
+
+    assert snippet.code.startswith("def sample_create_custom_class_Basic(")
+    assert snippet.code is snippet.code
+
+
+def test_write_to(snippet):
+    snippet.generate()
+    fp = io.StringIO()
+
+    snippet.write_to(fp)
+
+    assert fp.getvalue() == snippet.code
+
+
 def test_generate_should_raise_error_if_unsupported(snippet_bidi_streaming):
     with pytest.raises(ValueError):
         snippet_bidi_streaming.generate()